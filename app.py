@@ -1,11 +1,19 @@
 import streamlit as st
 import os
+import sys
 import json
+import time
+from datetime import datetime
 from pathlib import Path
 
-from directory_scanner import scan_directory
-from graph_visualization import create_force_directed_graph
-from utils import get_safe_path
+from scan_cache import ScanCache
+from scan_index import ScanIndex
+from tree_estimator import estimate_tree, entries_up_to_depth, recommend_depth
+from graph_visualization import (
+    create_force_directed_graph, create_treemap, create_sunburst, create_tree_explorer,
+    build_treemap_payload, build_sunburst_payload, build_explorer_payload, publish_selection
+)
+from utils import get_safe_path, format_size
 
 # Set page configuration
 st.set_page_config(
@@ -18,11 +26,22 @@ st.set_page_config(
     }
 )
 
+@st.cache_resource
+def get_scan_cache():
+    """Return the scan cache shared by every session in this server process."""
+    return ScanCache()
+
 # Initialize session state variables if they don't exist
 if 'directory_data' not in st.session_state:
     st.session_state.directory_data = None
 if 'selected_directory' not in st.session_state:
     st.session_state.selected_directory = None
+if 'scan_views' not in st.session_state:
+    st.session_state.scan_views = {}
+if 'size_estimate' not in st.session_state:
+    st.session_state.size_estimate = None
+if 'query_results' not in st.session_state:
+    st.session_state.query_results = None
 
 def main():
     # App title and description
@@ -46,6 +65,32 @@ def main():
             st.info(f"Using current directory: {directory_path}")
         
         depth_limit = st.slider("Max directory depth:", 1, 10, 3)
+        include_hidden = st.checkbox("Include hidden files and folders", value=False)
+        
+        # Sample the tree before committing to a deep scan
+        entry_budget = st.number_input("Entry budget:", min_value=100, max_value=1000000, value=5000, step=1000)
+        auto_depth = st.checkbox("Pick depth automatically from estimate", value=False)
+        
+        if st.button("Estimate Size"):
+            safe_path = get_safe_path(directory_path) if directory_path else None
+            if safe_path:
+                with st.spinner("Sampling directory tree..."):
+                    run_size_estimate(safe_path, include_hidden)
+            else:
+                st.error("Invalid directory path")
+        
+        estimate = get_size_estimate(directory_path, include_hidden)
+        if estimate:
+            render_size_estimate(estimate)
+            if auto_depth:
+                depth_limit = recommend_depth(estimate, entry_budget)
+                st.info(f"Using depth {depth_limit} to stay within {entry_budget:,} entries")
+            elif entries_up_to_depth(estimate, depth_limit) > entry_budget:
+                st.warning(
+                    f"Depth {depth_limit} is expected to return about "
+                    f"{entries_up_to_depth(estimate, depth_limit):,.0f} entries, over the budget of "
+                    f"{entry_budget:,}. Depth {recommend_depth(estimate, entry_budget)} should fit."
+                )
         
         if st.button("Visualize Directory"):
             if directory_path:
@@ -61,15 +106,22 @@ def main():
                         progress_bar.progress(20)
                         progress_placeholder.text("Scanning directory structure...")
                         
-                        # Scan directory
+                        # Estimate first when the depth should be picked automatically
+                        if auto_depth and estimate is None:
+                            progress_placeholder.text("Estimating directory size...")
+                            depth_limit = recommend_depth(run_size_estimate(safe_path, include_hidden), entry_budget)
+                        
+                        # Scan directory, reusing another session's result when it is still fresh
                         st.session_state.selected_directory = safe_path
-                        dir_data = scan_directory(safe_path, depth_limit)
+                        dir_data = get_scan_cache().get_or_scan(safe_path, depth_limit, include_hidden)
                         
                         progress_bar.progress(80)
                         progress_placeholder.text("Processing data for visualization...")
                         
-                        # Store data in session state
+                        # Store a reference to the shared, read-only result in session state
                         st.session_state.directory_data = dir_data
+                        st.session_state.scan_views = {}
+                        st.session_state.query_results = None
                         
                         progress_bar.progress(100)
                         progress_placeholder.text("Rendering visualization...")
@@ -88,16 +140,53 @@ def main():
     # Main area for visualization
     if st.session_state.directory_data:
         # Display basic directory info
-        st.subheader(f"Directory: {st.session_state.selected_directory}")
+        # Paths in the scan are resolved, so show the root in the same form
+        root_path = st.session_state.directory_data["path"]
+        st.subheader(f"Directory: {root_path}")
         
-        # Convert directory data to JSON for D3.js
-        directory_json = json.dumps(st.session_state.directory_data)
+        # Index the scan once for all sessions; queries then avoid walking the tree
+        index = get_scan_view("index", ScanIndex, size_of=ScanIndex.estimate_bytes)
+        highlight_path = render_query_panel(index, root_path)
         
-        # Create and display the force-directed graph
-        create_force_directed_graph(directory_json)
+        # Choose how to draw the directory
+        view_col, toggle_col = st.columns([3, 1])
+        with view_col:
+            view = st.radio(
+                "View:",
+                ["Force-directed graph", "Treemap", "Sunburst"],
+                horizontal=True
+            )
+        with toggle_col:
+            show_explorer = st.toggle("Show explorer", value=True)
+        
+        # The explorer sits next to the graph and shares its selection
+        if show_explorer:
+            graph_col, explorer_col = st.columns([3, 2])
+        else:
+            graph_col, explorer_col = st.container(), None
+        
+        with graph_col:
+            if view == "Treemap":
+                create_treemap(get_scan_view("treemap", build_treemap_payload))
+            elif view == "Sunburst":
+                create_sunburst(get_scan_view("sunburst", build_sunburst_payload))
+            else:
+                # Convert directory data to JSON for D3.js
+                directory_json = get_scan_view("graph", json.dumps)
+                
+                # Create and display the force-directed graph
+                create_force_directed_graph(directory_json)
+        
+        if explorer_col is not None:
+            with explorer_col:
+                create_tree_explorer(get_scan_view("explorer", build_explorer_payload))
+        
+        # Send the query selection to the views without changing their HTML,
+        # so selecting a row does not reload them
+        publish_selection(root_path, highlight_path)
         
         # Show some statistics about the directory
-        stats = calculate_directory_stats(st.session_state.directory_data)
+        stats = get_scan_view("stats", calculate_directory_stats)
         col1, col2, col3 = st.columns(3)
         with col1:
             st.metric("Total Files", stats["file_count"])
@@ -114,10 +203,149 @@ def main():
             - **Click on nodes** to highlight connections
             - **Scroll** to zoom in/out
             - **Drag the background** to pan around
+            - **Treemap / Sunburst** show what is taking the space: area or angle is proportional to size
+            - **Query files** finds the largest or oldest files; select a row to highlight it in the view
+            - **Explorer** lists the tree with folder totals; click a header to sort, click ▸ or double-click to expand, and click a row to select it in the graph (and vice versa)
             """)
     else:
         st.info("Select a directory from the sidebar to visualize its structure.")
 
+def get_scan_view(name, build, size_of=sys.getsizeof):
+    """
+    Return data derived from the current scan, building it only once per scan.
+    
+    The result is shared through the scan cache with every session viewing
+    the same scan, and remembered in this session for later reruns.
+    
+    Args:
+        name (str): Name of the derived view, e.g. "treemap"
+        build (callable): Builds the view from the scanned tree
+        size_of (callable): Estimates the bytes held by the view
+    """
+    views = st.session_state.scan_views
+    if name not in views:
+        views[name] = get_scan_cache().derived(
+            st.session_state.directory_data, name, build, size_of
+        )
+    return views[name]
+
+def run_size_estimate(safe_path, include_hidden):
+    """Sample the tree under safe_path and remember the estimate for this session."""
+    estimate = estimate_tree(safe_path, include_hidden=include_hidden)
+    st.session_state.size_estimate = {
+        "key": (str(safe_path.resolve()), include_hidden),
+        "estimate": estimate
+    }
+    return estimate
+
+def get_size_estimate(directory_path, include_hidden):
+    """Return the session's estimate if it was made for this path and filter."""
+    stored = st.session_state.size_estimate
+    safe_path = get_safe_path(directory_path) if directory_path else None
+    if stored and safe_path and stored["key"] == (str(safe_path.resolve()), include_hidden):
+        return stored["estimate"]
+    return None
+
+def render_size_estimate(estimate):
+    """Show the estimated tree size with 95% confidence intervals."""
+    entries = estimate["entries"]
+    size = estimate["bytes"]
+    st.markdown(
+        f"**Estimated size** ({estimate['samples']:,} walks in {estimate['elapsed']:.1f}s)  \n"
+        f"Entries: ~{entries['mean']:,.0f} ({entries['low']:,.0f}–{entries['high']:,.0f})  \n"
+        f"Bytes: ~{format_size(size['mean'])} ({format_size(size['low'])}–{format_size(size['high'])})"
+    )
+    
+    cumulative = 0
+    rows = []
+    for depth, level in enumerate(estimate["depth_profile"]):
+        cumulative += level["mean"]
+        rows.append({
+            "Depth": depth,
+            "Entries": round(level["mean"]),
+            "95% CI": f"{level['low']:,.0f}–{level['high']:,.0f}",
+            "Up to depth": round(cumulative)
+        })
+    st.dataframe(rows, hide_index=True, use_container_width=True)
+
+def render_query_panel(index, root_path):
+    """
+    Show the top-N file query panel and return the path selected in its results.
+    
+    Args:
+        index (ScanIndex): Index over the current scan
+        root_path (str): Resolved root of the scan, for relative folder filters
+        
+    Returns:
+        str or None: Path of the selected result row
+    """
+    with st.expander("🔎 Query files"):
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            prefix = st.text_input("Under folder:", "", placeholder=root_path)
+            extensions = st.text_input("Extensions (comma separated):", "", placeholder=".log, .tmp")
+        with col2:
+            min_size_mb = st.number_input("Minimum size (MB):", min_value=0.0, value=0.0)
+            older_than_days = st.number_input("Older than (days):", min_value=0, value=0)
+        with col3:
+            sort_by = st.selectbox("Sort by:", ["Size", "Modified"])
+            limit = st.number_input("Top N:", min_value=1, max_value=10000, value=100)
+        
+        # Scanned paths are resolved, so resolve the filter the same way
+        if prefix.strip():
+            prefix = str((Path(root_path) / Path(prefix.strip()).expanduser()).resolve())
+        else:
+            prefix = None
+        
+        extensions = tuple(ext.strip() if ext.strip().startswith(".") else "." + ext.strip()
+                           for ext in extensions.split(",") if ext.strip())
+        
+        # Rerun the query only when a filter or the scan changed, not on every rerun
+        key = (id(index), prefix, extensions, min_size_mb, older_than_days, sort_by, int(limit))
+        stored = st.session_state.query_results
+        if not stored or stored["key"] != key:
+            start = time.perf_counter()
+            results = index.query(
+                prefix=prefix,
+                extensions=extensions,
+                min_size=int(min_size_mb * 1024 * 1024) if min_size_mb else None,
+                modified_before=time.time() - older_than_days * 86400 if older_than_days else None,
+                sort_by=sort_by.lower(),
+                descending=sort_by == "Size",
+                limit=int(limit)
+            )
+            stored = st.session_state.query_results = {
+                "key": key,
+                "results": results,
+                "elapsed_ms": (time.perf_counter() - start) * 1000
+            }
+        results = stored["results"]
+        st.caption(f"{len(results)} of {len(index)} files in {stored['elapsed_ms']:.1f} ms")
+        
+        rows = [{
+            "Name": record["name"],
+            "Size": record["size"],
+            "Modified": datetime.fromtimestamp(record["modified"]),
+            "Extension": record["extension"],
+            "Path": record["path"]
+        } for record in results]
+        
+        event = st.dataframe(
+            rows,
+            use_container_width=True,
+            hide_index=True,
+            on_select="rerun",
+            selection_mode="single-row",
+            column_config={
+                "Size": st.column_config.NumberColumn("Size (bytes)", format="%d")
+            }
+        )
+        
+        selected_rows = event.selection.rows
+        if selected_rows and selected_rows[0] < len(results):
+            return results[selected_rows[0]]["path"]
+    return None
+
 def calculate_directory_stats(data):
     """Calculate basic statistics about the directory structure."""
     file_count = 0
@@ -2,13 +2,16 @@ import os
 from pathlib import Path
 import stat
 
-def scan_directory(directory_path, max_depth=3):
+def scan_directory(directory_path, max_depth=3, include_hidden=False, start_depth=0):
     """
     Scan a directory and build a hierarchical data structure suitable for D3.js visualization.
     
     Args:
         directory_path (str): Path to the directory to scan
         max_depth (int): Maximum depth to scan
+        include_hidden (bool): Whether to include hidden files/folders below the root
+        start_depth (int): Depth of directory_path within the tree being built,
+                           used when rescanning a subtree of an earlier scan
         
     Returns:
         dict: Hierarchical data structure representing the directory
@@ -53,7 +56,7 @@ def scan_directory(directory_path, max_depth=3):
                 # Get all children but skip hidden files/folders unless it's the root
                 for child in sorted(path.iterdir()):
                     # Skip hidden files/folders (starting with .) except at root level
-                    if current_depth > 0 and child.name.startswith('.'):
+                    if not include_hidden and current_depth > 0 and child.name.startswith('.'):
                         continue
                     
                     # Process the child path
@@ -81,9 +84,73 @@ def scan_directory(directory_path, max_depth=3):
         return None
     
     # Start processing from the root directory
-    result = process_path(directory_path)
+    result = process_path(directory_path, start_depth)
     return result
 
+def slice_tree(data, max_depth):
+    """
+    Derive a shallower view of a scan without touching the filesystem.
+    
+    The result matches what scan_directory would return for max_depth. Folder
+    nodes are copied so the input is never modified; file nodes are shared.
+    
+    Args:
+        data (dict): Hierarchical directory data from scan_directory
+        max_depth (int): Maximum depth to keep
+        
+    Returns:
+        dict: Hierarchical data structure truncated to max_depth
+    """
+    def copy_node(node, current_depth):
+        if node["type"] != "folder":
+            return node
+        
+        sliced = dict(node)
+        if current_depth >= max_depth:
+            sliced["children"] = []
+        else:
+            sliced["children"] = [copy_node(child, current_depth + 1)
+                                  for child in node.get("children", [])]
+        return sliced
+    
+    return copy_node(data, 0)
+
+def extend_tree(data, old_depth, new_depth, include_hidden=False):
+    """
+    Deepen an earlier scan by rescanning only its frontier.
+    
+    Folders at old_depth had their children cut off by the depth limit, so only
+    those are scanned again; everything above them is reused as is. Folders
+    are copied so the input is never modified.
+    
+    Args:
+        data (dict): Hierarchical directory data scanned to old_depth
+        old_depth (int): Depth limit data was scanned with
+        new_depth (int): Depth limit to extend to
+        include_hidden (bool): Must match the option data was scanned with
+        
+    Returns:
+        dict: Hierarchical data structure equivalent to a scan at new_depth
+    """
+    def extend_node(node, current_depth):
+        if node["type"] != "folder":
+            return node
+        
+        # Frontier folder: scan its subtree, keeping the existing node if that fails
+        if current_depth == old_depth:
+            if node.get("error"):
+                return node
+            rescanned = scan_directory(node["path"], new_depth, include_hidden,
+                                       start_depth=current_depth)
+            return rescanned or node
+        
+        extended = dict(node)
+        extended["children"] = [extend_node(child, current_depth + 1)
+                                for child in node.get("children", [])]
+        return extended
+    
+    return extend_node(data, 0)
+
 def get_file_type_group(extension):
     """Categorize file by its extension for better visualization."""
     extension = extension.lower()
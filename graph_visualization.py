@@ -1,6 +1,219 @@
 import streamlit as st
 import streamlit.components.v1 as components
 import json
+import os
+
+from tree_layout import treemap_layout, sunburst_layout, flatten_tree
+
+# JavaScript helpers shared by every view so colours and tooltips stay consistent
+_NODE_HELPERS_JS = """
+            // Get node color based on type and extension
+            function getNodeColor(node) {
+                if (node.error) {
+                    return "#ff6666"; // Red for error
+                }
+                
+                if (node.type === "folder") {
+                    return "#4285F4"; // Blue for folders
+                }
+                
+                // For files, color by extension category
+                const ext = (node.extension || "").toLowerCase();
+                if (['.js', '.py', '.java', '.c', '.cpp', '.html', '.css', '.php', '.swift', '.go'].includes(ext)) {
+                    return "#DB4437"; // Code files
+                } else if (['.txt', '.pdf', '.doc', '.docx', '.xls', '.xlsx', '.ppt', '.pptx', '.md'].includes(ext)) {
+                    return "#F4B400"; // Document files
+                } else if (['.jpg', '.jpeg', '.png', '.gif', '.svg', '.bmp', '.webp'].includes(ext)) {
+                    return "#0F9D58"; // Image files
+                } else {
+                    return "#E91E63"; // Other files
+                }
+            }
+            
+            // Build tooltip content with node details
+            function tooltipHtml(d) {
+                let tooltipContent = `
+                    <div class="tooltip-title">${d.name}</div>
+                    <div>Type: ${d.type === "folder" ? "Folder" : "File"}</div>
+                    <div>Path: ${d.path}</div>
+                `;
+                
+                if (d.type === "file") {
+                    tooltipContent += `
+                        <div>Extension: ${d.extension || "None"}</div>
+                        <div>Size: ${formatBytes(d.size)}</div>
+                        <div>Modified: ${formatDate(d.modified)}</div>
+                    `;
+                } else if (d.size) {
+                    // Rolled-up size, carried by the treemap and sunburst records
+                    tooltipContent += `<div>Total size: ${formatBytes(d.size)}</div>`;
+                }
+                
+                if (d.error) {
+                    tooltipContent += `<div style="color: red">Error: ${d.error}</div>`;
+                }
+                
+                return tooltipContent;
+            }
+            
+            // Format bytes to human-readable format
+            function formatBytes(bytes) {
+                if (!bytes || isNaN(bytes) || bytes === 0) return "0 B";
+                const sizes = ["B", "KB", "MB", "GB", "TB"];
+                const i = Math.floor(Math.log(bytes) / Math.log(1024));
+                return parseFloat((bytes / Math.pow(1024, i)).toFixed(2)) + " " + sizes[i];
+            }
+            
+            // Format timestamp to readable date
+            function formatDate(timestamp) {
+                if (!timestamp) return "Unknown";
+                return new Date(timestamp * 1000).toLocaleString();
+            }
+            
+            // Share the selected path with the other views of the same directory
+            function openSelectionChannel(rootPath, onSelect) {
+                if (typeof BroadcastChannel === "undefined") {
+                    return () => {};
+                }
+                const channel = new BroadcastChannel("directory-selection:" + rootPath);
+                channel.onmessage = (event) => {
+                    if (event.data.path) {
+                        onSelect(event.data.path);
+                    }
+                };
+                // Ask for a selection made before this view loaded
+                channel.postMessage({ request: true });
+                return (path) => channel.postMessage({ path });
+            }
+"""
+
+# Force simulation run inside a Web Worker; positions are sent back to the page
+# in transferable Float32Array buffers, one frame at a time
+_SIMULATION_WORKER_JS = """
+            importScripts("https://d3js.org/d3.v7.min.js");
+            
+            let simulation = null;
+            let nodes = [];
+            let awaitingAck = false;
+            let dirty = false;
+            let spare = null;
+            
+            // Prepare the data for D3.js force-directed graph
+            function prepareGraphData(data) {
+                const nodes = [];
+                const links = [];
+                const stack = [[data, null]];
+                
+                while (stack.length > 0) {
+                    const [node, parentId] = stack.pop();
+                    const nodeId = nodes.length;
+                    
+                    // Add the current node
+                    nodes.push({
+                        id: nodeId,
+                        name: node.name,
+                        path: node.path,
+                        type: node.type,
+                        extension: node.extension || "",
+                        size: node.size || 0,
+                        modified: node.modified || 0,
+                        error: node.error || null
+                    });
+                    
+                    // Link to parent if exists
+                    if (parentId !== null) {
+                        links.push({ source: parentId, target: nodeId });
+                    }
+                    
+                    // Queue children in reverse so they keep their original order
+                    const children = node.children || [];
+                    for (let i = children.length - 1; i >= 0; i--) {
+                        stack.push([children[i], nodeId]);
+                    }
+                }
+                
+                return { nodes, links };
+            }
+            
+            function sendPositions() {
+                if (awaitingAck) {
+                    dirty = true;
+                    return;
+                }
+                
+                const size = nodes.length * 2;
+                const positions = spare && spare.length === size ? spare : new Float32Array(size);
+                spare = null;
+                for (let i = 0; i < nodes.length; i++) {
+                    positions[i * 2] = nodes[i].x;
+                    positions[i * 2 + 1] = nodes[i].y;
+                }
+                
+                awaitingAck = true;
+                dirty = false;
+                postMessage({ type: "tick", positions, alpha: simulation.alpha() }, [positions.buffer]);
+            }
+            
+            self.onmessage = (event) => {
+                const message = event.data;
+                
+                if (message.type === "init") {
+                    const graphData = prepareGraphData(message.hierarchy);
+                    
+                    // Send node metadata once; only positions travel on later frames
+                    postMessage({
+                        type: "graph",
+                        nodes: graphData.nodes,
+                        links: graphData.links.map(l => ({ source: l.source, target: l.target }))
+                    });
+                    
+                    nodes = graphData.nodes;
+                    simulation = d3.forceSimulation(nodes)
+                        .force("link", d3.forceLink(graphData.links)
+                            .id(d => d.id)
+                            .distance(50)
+                            .strength(message.linkStrength))
+                        .force("charge", d3.forceManyBody().strength(-100))
+                        .force("center", d3.forceCenter(message.width / 2, message.height / 2))
+                        .force("x", d3.forceX(message.width / 2).strength(0.05))
+                        .force("y", d3.forceY(message.height / 2).strength(0.05))
+                        .on("tick", sendPositions)
+                        .on("end", () => {
+                            sendPositions();
+                            postMessage({ type: "end" });
+                        });
+                } else if (!simulation) {
+                    return;
+                } else if (message.type === "ack") {
+                    awaitingAck = false;
+                    if (message.buffer) {
+                        spare = message.buffer;
+                    }
+                    if (dirty) {
+                        sendPositions();
+                    }
+                } else if (message.type === "strength") {
+                    simulation.force("link").strength(message.value);
+                    simulation.alpha(0.3).restart();
+                } else if (message.type === "dragstart") {
+                    if (!message.active) simulation.alphaTarget(0.3).restart();
+                    nodes[message.index].fx = message.x;
+                    nodes[message.index].fy = message.y;
+                } else if (message.type === "drag") {
+                    nodes[message.index].fx = message.x;
+                    nodes[message.index].fy = message.y;
+                } else if (message.type === "dragend") {
+                    if (!message.active) simulation.alphaTarget(0);
+                    nodes[message.index].fx = null;
+                    nodes[message.index].fy = null;
+                } else if (message.type === "resize") {
+                    simulation.force("center", d3.forceCenter(message.width / 2, message.height / 2));
+                    simulation.force("x").x(message.width / 2);
+                    simulation.force("y").y(message.height / 2);
+                    simulation.alpha(0.3).restart();
+                }
+            };
+"""
 
 def create_force_directed_graph(data_json):
     """
@@ -144,77 +357,101 @@ def create_force_directed_graph(data_json):
         </div>
         <div id="graph-container"></div>
         <div class="tooltip" id="tooltip"></div>
+        <script id="simulation-worker" type="javascript/worker">
+            {_SIMULATION_WORKER_JS}
+        </script>
         <script>
             // Parse the data passed from Python
             const hierarchyData = {data_json};
+            {_NODE_HELPERS_JS}
+            // Show progress bar until the layout converges
+            const progressContainer = document.getElementById("progress-container");
+            const progressBar = document.getElementById("progress-bar");
+            progressContainer.style.display = "block";
+            progressBar.style.width = "10%";
             
-            // Prepare the data for D3.js force-directed graph
-            function prepareGraphData(data) {{
-                const nodes = [];
-                const links = [];
-                
-                function processNode(node, parentId = null) {{
-                    const nodeId = nodes.length;
-                    
-                    // Add the current node
-                    nodes.push({{
-                        id: nodeId,
-                        name: node.name,
-                        path: node.path,
-                        type: node.type,
-                        extension: node.extension || "",
-                        size: node.size || 0,
-                        modified: node.modified || 0,
-                        error: node.error || null
-                    }});
-                    
-                    // Link to parent if exists
-                    if (parentId !== null) {{
-                        links.push({{
-                            source: parentId,
-                            target: nodeId
-                        }});
-                    }}
-                    
-                    // Process children recursively
-                    if (node.children && node.children.length > 0) {{
-                        for (const child of node.children) {{
-                            processNode(child, nodeId);
-                        }}
-                    }}
-                    
-                    return nodeId;
+            // The simulation and data preparation run in a Web Worker so the
+            // main thread is left free for drawing, zooming, dragging and tooltips
+            const workerSource = document.getElementById("simulation-worker").textContent;
+            const worker = new Worker(URL.createObjectURL(
+                new Blob([workerSource], {{ type: "text/javascript" }})
+            ));
+            
+            const graphContainer = document.getElementById("graph-container");
+            let containerWidth = graphContainer.clientWidth;
+            let containerHeight = graphContainer.clientHeight;
+            
+            let graphData = null;
+            let positions = null;
+            let frameRequested = false;
+            let svg, link, node;
+            
+            worker.onmessage = (event) => {{
+                const message = event.data;
+                if (message.type === "graph") {{
+                    graphData = {{ nodes: message.nodes, links: message.links }};
+                    createForceGraph();
+                }} else if (message.type === "tick") {{
+                    // Hand the previous buffer back so the worker can reuse it
+                    const previous = positions;
+                    positions = message.positions;
+                    updateProgress(message.alpha);
+                    requestFrame(previous);
+                }} else if (message.type === "end") {{
+                    progressContainer.style.display = "none";
                 }}
-                
-                processNode(data);
-                return {{ nodes, links }};
-            }}
+            }};
             
-            // Show progress bar while processing data
-            const progressContainer = document.getElementById("progress-container");
-            const progressBar = document.getElementById("progress-bar");
+            worker.postMessage({{
+                type: "init",
+                hierarchy: hierarchyData,
+                width: containerWidth,
+                height: containerHeight,
+                linkStrength: parseFloat(document.getElementById("link-strength").value)
+            }});
             
-            // Show the progress bar
-            progressContainer.style.display = "block";
-            progressBar.style.width = "25%";
+            // Alpha decays geometrically from 1 towards alphaMin (0.001)
+            function updateProgress(alpha) {{
+                const done = Math.min(1, Math.log(alpha) / Math.log(0.001));
+                progressBar.style.width = Math.max(10, done * 100) + "%";
+            }}
             
-            // Process data with simulated progress updates
-            setTimeout(() => {{ progressBar.style.width = "50%"; }}, 200);
-            setTimeout(() => {{ progressBar.style.width = "75%"; }}, 400);
+            // Draw at most one frame per animation frame, then ask for the next positions
+            function requestFrame(spareBuffer) {{
+                if (frameRequested) {{
+                    return;
+                }}
+                frameRequested = true;
+                requestAnimationFrame(() => {{
+                    frameRequested = false;
+                    drawFrame();
+                    if (spareBuffer && spareBuffer.byteLength) {{
+                        worker.postMessage({{ type: "ack", buffer: spareBuffer }}, [spareBuffer.buffer]);
+                    }} else {{
+                        worker.postMessage({{ type: "ack" }});
+                    }}
+                }});
+            }}
             
-            // Prepare graph data with a slight delay to show progress
-            let graphData;
-            setTimeout(() => {{
-                graphData = prepareGraphData(hierarchyData);
-                progressBar.style.width = "100%";
+            function drawFrame() {{
+                if (!node || !positions) {{
+                    return;
+                }}
                 
-                // Hide progress bar after a short delay
-                setTimeout(() => {{
-                    progressContainer.style.display = "none";
-                    // Create the visualization once data is prepared
-                    createForceGraph();
-                }}, 300);
-            }}, 600);
+                // Keep datum coordinates current so d3.drag picks up the right subject
+                for (const d of graphData.nodes) {{
+                    d.x = positions[d.id * 2];
+                    d.y = positions[d.id * 2 + 1];
+                }}
+                
+                link
+                    .attr("x1", d => positions[d.source * 2])
+                    .attr("y1", d => positions[d.source * 2 + 1])
+                    .attr("x2", d => positions[d.target * 2])
+                    .attr("y2", d => positions[d.target * 2 + 1]);
+                
+                node.attr("transform", d => `translate(${{d.x}},${{d.y}})`);
+            }}
             
             // Create the D3.js visualization
             function createForceGraph() {{
@@ -222,10 +459,7 @@ def create_force_directed_graph(data_json):
                 d3.select("#graph-container").html("");
                 
                 // Create SVG container
-                const containerWidth = document.getElementById("graph-container").clientWidth;
-                const containerHeight = document.getElementById("graph-container").clientHeight;
-                
-                const svg = d3.select("#graph-container")
+                svg = d3.select("#graph-container")
                     .append("svg")
                     .attr("width", containerWidth)
                     .attr("height", containerHeight);
@@ -251,29 +485,14 @@ def create_force_directed_graph(data_json):
                 // Create tooltip
                 const tooltip = d3.select("#tooltip");
                 
-                // Get link strength from slider
-                let linkStrength = parseFloat(document.getElementById("link-strength").value);
-                
                 // Update force simulation when slider changes
                 d3.select("#link-strength").on("input", function() {{
-                    linkStrength = parseFloat(this.value);
-                    simulation.force("link").strength(linkStrength);
-                    simulation.alpha(0.3).restart();
+                    progressContainer.style.display = "block";
+                    worker.postMessage({{ type: "strength", value: parseFloat(this.value) }});
                 }});
                 
-                // Create the simulation
-                const simulation = d3.forceSimulation(graphData.nodes)
-                    .force("link", d3.forceLink(graphData.links)
-                        .id(d => d.id)
-                        .distance(50)
-                        .strength(linkStrength))
-                    .force("charge", d3.forceManyBody().strength(-100))
-                    .force("center", d3.forceCenter(containerWidth / 2, containerHeight / 2))
-                    .force("x", d3.forceX(containerWidth / 2).strength(0.05))
-                    .force("y", d3.forceY(containerHeight / 2).strength(0.05));
-                
                 // Draw links
-                const link = g.append("g")
+                link = g.append("g")
                     .attr("class", "links")
                     .selectAll("line")
                     .data(graphData.links)
@@ -282,7 +501,7 @@ def create_force_directed_graph(data_json):
                     .attr("class", "link");
                 
                 // Draw nodes
-                const node = g.append("g")
+                node = g.append("g")
                     .attr("class", "nodes")
                     .selectAll(".node")
                     .data(graphData.nodes)
@@ -307,55 +526,24 @@ def create_force_directed_graph(data_json):
                     .attr("dy", 15)
                     .text(d => truncateText(d.name, 20));
                 
+                drawFrame();
+                
+                // Follow selections made in the other views
+                const publishSelection = openSelectionChannel(hierarchyData.path, (path) => {{
+                    const d = graphData.nodes.find(n => n.path === path);
+                    if (d) {{
+                        highlightNode(d);
+                    }}
+                }});
+                
                 // Function to truncate text with ellipsis
                 function truncateText(text, maxLength) {{
                     return text.length > maxLength ? text.substring(0, maxLength) + "..." : text;
                 }}
                 
-                // Get node color based on type and extension
-                function getNodeColor(node) {{
-                    if (node.error) {{
-                        return "#ff6666"; // Red for error
-                    }}
-                    
-                    if (node.type === "folder") {{
-                        return "#4285F4"; // Blue for folders
-                    }}
-                    
-                    // For files, color by extension category
-                    const ext = node.extension.toLowerCase();
-                    if (['.js', '.py', '.java', '.c', '.cpp', '.html', '.css', '.php', '.swift', '.go'].includes(ext)) {{
-                        return "#DB4437"; // Code files
-                    }} else if (['.txt', '.pdf', '.doc', '.docx', '.xls', '.xlsx', '.ppt', '.pptx', '.md'].includes(ext)) {{
-                        return "#F4B400"; // Document files
-                    }} else if (['.jpg', '.jpeg', '.png', '.gif', '.svg', '.bmp', '.webp'].includes(ext)) {{
-                        return "#0F9D58"; // Image files
-                    }} else {{
-                        return "#E91E63"; // Other files
-                    }}
-                }}
-                
                 // Show tooltip with node details
                 function showTooltip(event, d) {{
-                    let tooltipContent = `
-                        <div class="tooltip-title">${{d.name}}</div>
-                        <div>Type: ${{d.type === "folder" ? "Folder" : "File"}}</div>
-                        <div>Path: ${{d.path}}</div>
-                    `;
-                    
-                    if (d.type === "file") {{
-                        tooltipContent += `
-                            <div>Extension: ${{d.extension || "None"}}</div>
-                            <div>Size: ${{formatBytes(d.size)}}</div>
-                            <div>Modified: ${{formatDate(d.modified)}}</div>
-                        `;
-                    }}
-                    
-                    if (d.error) {{
-                        tooltipContent += `<div style="color: red">Error: ${{d.error}}</div>`;
-                    }}
-                    
-                    tooltip.html(tooltipContent)
+                    tooltip.html(tooltipHtml(d))
                         .style("left", (event.pageX + 10) + "px")
                         .style("top", (event.pageY - 10) + "px")
                         .style("opacity", 1);
@@ -366,25 +554,33 @@ def create_force_directed_graph(data_json):
                     tooltip.style("opacity", 0);
                 }}
                 
-                // Highlight connections on click
+                // Highlight connections on click and tell the other views
                 function highlightConnections(event, d) {{
+                    highlightNode(d);
+                    publishSelection(d.path);
+                    
+                    // Stop event propagation
+                    event.stopPropagation();
+                }}
+                
+                function highlightNode(d) {{
                     // Reset all links and nodes
                     link.style("stroke", "#656565").style("stroke-width", 1.5);
                     node.select("circle").style("stroke", "#2d2d2d").style("stroke-width", 1.5);
                     
                     // Find connected links and nodes
                     const connectedLinks = graphData.links.filter(l => 
-                        l.source.id === d.id || l.target.id === d.id
+                        l.source === d.id || l.target === d.id
                     );
                     
                     const connectedNodeIds = new Set();
                     connectedLinks.forEach(l => {{
-                        connectedNodeIds.add(l.source.id);
-                        connectedNodeIds.add(l.target.id);
+                        connectedNodeIds.add(l.source);
+                        connectedNodeIds.add(l.target);
                     }});
                     
                     // Highlight connected links
-                    link.filter(l => l.source.id === d.id || l.target.id === d.id)
+                    link.filter(l => l.source === d.id || l.target === d.id)
                         .style("stroke", "#ff7f0e")
                         .style("stroke-width", 3);
                     
@@ -393,9 +589,6 @@ def create_force_directed_graph(data_json):
                         .select("circle")
                         .style("stroke", "#ff7f0e")
                         .style("stroke-width", 3);
-                    
-                    // Stop event propagation
-                    event.stopPropagation();
                 }}
                 
                 // Reset highlights when clicking on background
@@ -404,56 +597,37 @@ def create_force_directed_graph(data_json):
                     node.select("circle").style("stroke", "#2d2d2d").style("stroke-width", 1.5);
                 }});
                 
-                // Format bytes to human-readable format
-                function formatBytes(bytes) {{
-                    if (!bytes || isNaN(bytes) || bytes === 0) return "0 B";
-                    const sizes = ["B", "KB", "MB", "GB", "TB"];
-                    const i = Math.floor(Math.log(bytes) / Math.log(1024));
-                    return parseFloat((bytes / Math.pow(1024, i)).toFixed(2)) + " " + sizes[i];
-                }}
-                
-                // Format timestamp to readable date
-                function formatDate(timestamp) {{
-                    if (!timestamp) return "Unknown";
-                    return new Date(timestamp * 1000).toLocaleString();
+                // Drag functions: move the node locally right away and pin it in the worker
+                function moveLocally(d, x, y) {{
+                    if (positions) {{
+                        positions[d.id * 2] = x;
+                        positions[d.id * 2 + 1] = y;
+                    }}
+                    drawFrame();
                 }}
                 
-                // Drag functions
                 function dragstarted(event, d) {{
-                    if (!event.active) simulation.alphaTarget(0.3).restart();
-                    d.fx = d.x;
-                    d.fy = d.y;
+                    worker.postMessage({{ type: "dragstart", index: d.id, x: d.x, y: d.y, active: event.active }});
                 }}
                 
                 function dragged(event, d) {{
-                    d.fx = event.x;
-                    d.fy = event.y;
+                    moveLocally(d, event.x, event.y);
+                    worker.postMessage({{ type: "drag", index: d.id, x: event.x, y: event.y }});
                 }}
                 
                 function dragended(event, d) {{
-                    if (!event.active) simulation.alphaTarget(0);
-                    d.fx = null;
-                    d.fy = null;
+                    worker.postMessage({{ type: "dragend", index: d.id, active: event.active }});
                 }}
-                
-                // Update simulation on tick
-                simulation.on("tick", () => {{
-                    link
-                        .attr("x1", d => d.source.x)
-                        .attr("y1", d => d.source.y)
-                        .attr("x2", d => d.target.x)
-                        .attr("y2", d => d.target.y);
-                    
-                    node.attr("transform", d => `translate(${{d.x}},${{d.y}})`);
-                }});
             }}
             
-            // Initialize the visualization
-            createForceGraph();
-            
             // Handle window resize
             window.addEventListener("resize", () => {{
-                createForceGraph();
+                containerWidth = graphContainer.clientWidth;
+                containerHeight = graphContainer.clientHeight;
+                if (svg) {{
+                    svg.attr("width", containerWidth).attr("height", containerHeight);
+                }}
+                worker.postMessage({{ type: "resize", width: containerWidth, height: containerHeight }});
             }});
         </script>
     </body>
@@ -462,3 +636,755 @@ def create_force_directed_graph(data_json):
     
     # Display the HTML in Streamlit
     components.html(html_code, height=680)
+
+def _render_canvas_view(title, payload_json, draw_js):
+    """
+    Render a precomputed layout on an HTML canvas in Streamlit.
+    
+    Args:
+        title (str): Label shown in the control panel
+        payload_json (str): JSON string with the layout computed in Python
+        draw_js (str): JavaScript defining drawView(ctx, width, height) and
+                       findRecord(x, y) for the specific layout
+    """
+    html_code = f"""
+    <!DOCTYPE html>
+    <html>
+    <head>
+        <meta charset="utf-8">
+        <style>
+            #view-container {{
+                position: relative;
+                width: 100%;
+                height: 600px;
+                border: 1px solid #444;
+                border-radius: 5px;
+                overflow: hidden;
+                margin-top: 10px;
+                background-color: #1e1e1e;
+            }}
+            
+            #view-canvas {{
+                display: block;
+                cursor: pointer;
+            }}
+            
+            .tooltip {{
+                position: absolute;
+                background: #2d2d2d;
+                color: #e0e0e0;
+                border: 1px solid #444;
+                border-radius: 4px;
+                padding: 10px;
+                font-size: 12px;
+                pointer-events: none;
+                opacity: 0;
+                transition: opacity 0.3s;
+                box-shadow: 0 2px 4px rgba(0,0,0,0.3);
+                max-width: 300px;
+                white-space: nowrap;
+                overflow: hidden;
+                text-overflow: ellipsis;
+            }}
+            
+            .tooltip-title {{
+                font-weight: bold;
+                margin-bottom: 5px;
+                color: #fff;
+            }}
+            
+            .control-panel {{
+                padding: 10px;
+                background: #2d2d2d;
+                border-bottom: 1px solid #444;
+                display: flex;
+                justify-content: space-between;
+                color: #e0e0e0;
+                font-family: sans-serif;
+                font-size: 12px;
+            }}
+        </style>
+    </head>
+    <body>
+        <div class="control-panel">
+            <div>{title}</div>
+            <div>🔴 Code &nbsp; 🟡 Documents &nbsp; 🟢 Images &nbsp; 🩷 Other &nbsp; 🔵 Folders</div>
+        </div>
+        <div id="view-container">
+            <canvas id="view-canvas"></canvas>
+        </div>
+        <div class="tooltip" id="tooltip"></div>
+        <script>
+            // Layout computed once in Python, drawn in a single pass
+            const payload = {payload_json};
+            const records = payload.records;
+            // Small nodes have no record, so fall back to their deepest drawn ancestor
+            const pathSep = {json.dumps(os.sep)};
+            function findRecordOrAncestor(path) {{
+                if (!path) return null;
+                let best = null;
+                for (const r of records) {{
+                    const rest = path.slice(r.path.length);
+                    const inside = rest === "" || rest.startsWith(pathSep) || r.path.endsWith(pathSep);
+                    if (path.startsWith(r.path) && inside && (!best || r.depth > best.depth)) {{
+                        best = r;
+                    }}
+                }}
+                return best;
+            }}
+            
+            let selected = null;
+            {_NODE_HELPERS_JS}
+            {draw_js}
+            
+            const container = document.getElementById("view-container");
+            const canvas = document.getElementById("view-canvas");
+            const ctx = canvas.getContext("2d");
+            const tooltip = document.getElementById("tooltip");
+            let hovered = null;
+            
+            function render() {{
+                const width = container.clientWidth;
+                const height = container.clientHeight;
+                const ratio = window.devicePixelRatio || 1;
+                canvas.width = width * ratio;
+                canvas.height = height * ratio;
+                canvas.style.width = width + "px";
+                canvas.style.height = height + "px";
+                ctx.setTransform(ratio, 0, 0, ratio, 0, 0);
+                ctx.clearRect(0, 0, width, height);
+                drawView(ctx, width, height);
+                if (selected) {{
+                    outlineRecord(ctx, selected, width, height);
+                }}
+                if (hovered) {{
+                    outlineRecord(ctx, hovered, width, height);
+                }}
+            }}
+            
+            // Hit-test at most once per animation frame
+            let pendingMove = null;
+            canvas.addEventListener("mousemove", (event) => {{
+                const scheduled = pendingMove !== null;
+                pendingMove = event;
+                if (scheduled) return;
+                requestAnimationFrame(() => {{
+                    const e = pendingMove;
+                    pendingMove = null;
+                    const rect = canvas.getBoundingClientRect();
+                    const found = findRecord(e.clientX - rect.left, e.clientY - rect.top,
+                                             rect.width, rect.height);
+                    if (found !== hovered) {{
+                        hovered = found;
+                        render();
+                    }}
+                    if (found) {{
+                        tooltip.innerHTML = tooltipHtml(found);
+                        tooltip.style.left = (e.pageX + 10) + "px";
+                        tooltip.style.top = (e.pageY - 10) + "px";
+                        tooltip.style.opacity = 1;
+                    }} else {{
+                        tooltip.style.opacity = 0;
+                    }}
+                }});
+            }});
+            
+            // Keep the clicked record outlined and tell the other views
+            const publishSelection = openSelectionChannel(records[0].path, (path) => {{
+                selected = findRecordOrAncestor(path);
+                render();
+            }});
+            
+            canvas.addEventListener("click", () => {{
+                if (hovered) {{
+                    selected = hovered;
+                    publishSelection(hovered.path);
+                    render();
+                }}
+            }});
+            
+            canvas.addEventListener("mouseleave", () => {{
+                tooltip.style.opacity = 0;
+                if (hovered) {{
+                    hovered = null;
+                    render();
+                }}
+            }});
+            
+            render();
+            window.addEventListener("resize", render);
+        </script>
+    </body>
+    </html>
+    """
+    
+    components.html(html_code, height=680)
+
+def build_treemap_payload(data, width=1200, height=600):
+    """
+    Compute the treemap layout for a scan, ready to pass to create_treemap.
+    
+    The result only depends on the scan, so callers should build it once per
+    scan and reuse it across reruns.
+    
+    Args:
+        data (dict): Hierarchical directory data from scan_directory
+        width (int): Logical layout width, scaled to the canvas on draw
+        height (int): Logical layout height, scaled to the canvas on draw
+        
+    Returns:
+        str: JSON string with the layout
+    """
+    return json.dumps({
+        "width": width,
+        "height": height,
+        "records": treemap_layout(data, width, height)
+    })
+
+def create_treemap(payload_json):
+    """
+    Create a squarified treemap of the directory in Streamlit.
+    
+    The layout is computed in Python from folder size rollups and drawn on a
+    canvas without any simulation.
+    
+    Args:
+        payload_json (str): Layout from build_treemap_payload
+    """
+    draw_js = """
+            // Logical layout coordinates are stretched to the canvas size
+            function toCanvas(r, width, height) {
+                const sx = width / payload.width;
+                const sy = height / payload.height;
+                return [r.x0 * sx, r.y0 * sy, (r.x1 - r.x0) * sx, (r.y1 - r.y0) * sy];
+            }
+            
+            function drawView(ctx, width, height) {
+                ctx.font = "11px sans-serif";
+                ctx.textBaseline = "top";
+                for (const r of records) {
+                    const [x, y, w, h] = toCanvas(r, width, height);
+                    ctx.globalAlpha = r.type === "folder" ? 0.25 : 0.9;
+                    ctx.fillStyle = getNodeColor(r);
+                    ctx.fillRect(x, y, w, h);
+                    ctx.globalAlpha = 1;
+                    if (w > 3 && h > 3) {
+                        ctx.strokeStyle = "#1e1e1e";
+                        ctx.lineWidth = 1;
+                        ctx.strokeRect(x, y, w, h);
+                    }
+                    if (w > 40 && h > 14) {
+                        ctx.save();
+                        ctx.beginPath();
+                        ctx.rect(x, y, w, h);
+                        ctx.clip();
+                        ctx.fillStyle = "#e0e0e0";
+                        ctx.fillText(r.name, x + 3, y + 2);
+                        ctx.restore();
+                    }
+                }
+            }
+            
+            function outlineRecord(ctx, r, width, height) {
+                const [x, y, w, h] = toCanvas(r, width, height);
+                ctx.strokeStyle = "#ff7f0e";
+                ctx.lineWidth = 2;
+                ctx.strokeRect(x, y, w, h);
+            }
+            
+            // Records are in pre-order, so the last match is the deepest
+            function findRecord(px, py, width, height) {
+                const lx = px * payload.width / width;
+                const ly = py * payload.height / height;
+                for (let i = records.length - 1; i >= 0; i--) {
+                    const r = records[i];
+                    if (lx >= r.x0 && lx < r.x1 && ly >= r.y0 && ly < r.y1) {
+                        return r;
+                    }
+                }
+                return null;
+            }
+    """
+    
+    _render_canvas_view("Treemap (area = size)", payload_json, draw_js)
+
+def build_sunburst_payload(data):
+    """
+    Compute the sunburst layout for a scan, ready to pass to create_sunburst.
+    
+    The result only depends on the scan, so callers should build it once per
+    scan and reuse it across reruns.
+    
+    Args:
+        data (dict): Hierarchical directory data from scan_directory
+        
+    Returns:
+        str: JSON string with the layout
+    """
+    records, max_depth = sunburst_layout(data)
+    return json.dumps({
+        "maxDepth": max_depth,
+        "records": records
+    })
+
+def create_sunburst(payload_json):
+    """
+    Create a sunburst of the directory in Streamlit.
+    
+    Each ring is one level of depth and arc length is proportional to size.
+    The layout is computed in Python and drawn on a canvas.
+    
+    Args:
+        payload_json (str): Layout from build_sunburst_payload
+    """
+    draw_js = """
+            // Group records by ring; pre-order keeps each ring sorted by angle
+            const rings = [];
+            for (const r of records) {
+                (rings[r.depth] = rings[r.depth] || []).push(r);
+            }
+            
+            function geometry(width, height) {
+                const radius = Math.min(width, height) / 2 - 10;
+                return {
+                    cx: width / 2,
+                    cy: height / 2,
+                    ring: radius / (payload.maxDepth + 1)
+                };
+            }
+            
+            function arcPath(ctx, r, g) {
+                const inner = r.depth * g.ring;
+                const outer = inner + g.ring;
+                ctx.beginPath();
+                ctx.arc(g.cx, g.cy, outer, r.x0, r.x1);
+                ctx.arc(g.cx, g.cy, inner, r.x1, r.x0, true);
+                ctx.closePath();
+            }
+            
+            function drawView(ctx, width, height) {
+                const g = geometry(width, height);
+                ctx.strokeStyle = "#1e1e1e";
+                ctx.lineWidth = 0.5;
+                for (const r of records) {
+                    arcPath(ctx, r, g);
+                    ctx.globalAlpha = r.type === "folder" ? 0.6 : 0.9;
+                    ctx.fillStyle = getNodeColor(r);
+                    ctx.fill();
+                    ctx.globalAlpha = 1;
+                    if ((r.x1 - r.x0) * (r.depth + 1) * g.ring > 3) {
+                        ctx.stroke();
+                    }
+                }
+            }
+            
+            function outlineRecord(ctx, r, width, height) {
+                arcPath(ctx, r, geometry(width, height));
+                ctx.strokeStyle = "#ff7f0e";
+                ctx.lineWidth = 2;
+                ctx.stroke();
+            }
+            
+            // Pick the ring from the radius, then binary search by angle
+            function findRecord(px, py, width, height) {
+                const g = geometry(width, height);
+                const dx = px - g.cx;
+                const dy = py - g.cy;
+                const depth = Math.floor(Math.sqrt(dx * dx + dy * dy) / g.ring);
+                const ring = rings[depth];
+                if (!ring) return null;
+                let angle = Math.atan2(dy, dx);
+                if (angle < 0) angle += 2 * Math.PI;
+                let lo = 0;
+                let hi = ring.length - 1;
+                while (lo <= hi) {
+                    const mid = (lo + hi) >> 1;
+                    if (angle < ring[mid].x0) {
+                        hi = mid - 1;
+                    } else if (angle >= ring[mid].x1) {
+                        lo = mid + 1;
+                    } else {
+                        return ring[mid];
+                    }
+                }
+                return null;
+            }
+    """
+    
+    _render_canvas_view("Sunburst (angle = size, ring = depth)", payload_json, draw_js)
+
+def build_explorer_payload(data):
+    """
+    Flatten a scan for create_tree_explorer.
+    
+    The result only depends on the scan, so callers should build it once per
+    scan and reuse it across reruns.
+    
+    Args:
+        data (dict): Hierarchical directory data from scan_directory
+        
+    Returns:
+        str: JSON string with the flattened tree and folder rollups
+    """
+    payload = flatten_tree(data)
+    payload["sep"] = os.sep
+    return json.dumps(payload)
+
+def create_tree_explorer(payload_json):
+    """
+    Create a virtualized tree/table explorer of the directory in Streamlit.
+    
+    The tree is sent as flat columns with folder rollups, and only the rows
+    visible in the scroll viewport are rendered, so scrolling stays smooth on
+    very large scans. Selections are shared with the graph views.
+    
+    Args:
+        payload_json (str): Flattened tree from build_explorer_payload
+    """
+    html_code = f"""
+    <!DOCTYPE html>
+    <html>
+    <head>
+        <meta charset="utf-8">
+        <style>
+            body {{
+                margin: 0;
+                font-family: sans-serif;
+                font-size: 12px;
+                color: #e0e0e0;
+            }}
+            
+            .explorer-header, .explorer-row {{
+                display: grid;
+                grid-template-columns: 1fr 80px 60px 130px;
+                align-items: center;
+                height: 22px;
+                padding: 0 6px;
+                white-space: nowrap;
+            }}
+            
+            .explorer-header {{
+                background: #2d2d2d;
+                border: 1px solid #444;
+                border-radius: 5px 5px 0 0;
+                font-weight: bold;
+                height: 36px;
+            }}
+            
+            .explorer-header span {{
+                cursor: pointer;
+            }}
+            
+            .explorer-header .numeric, .explorer-row .numeric {{
+                text-align: right;
+                padding-right: 8px;
+            }}
+            
+            #viewport {{
+                position: relative;
+                height: 600px;
+                overflow-y: auto;
+                background-color: #1e1e1e;
+                border: 1px solid #444;
+                border-top: none;
+                border-radius: 0 0 5px 5px;
+            }}
+            
+            #rows {{
+                position: absolute;
+                top: 0;
+                left: 0;
+                right: 0;
+            }}
+            
+            .explorer-row {{
+                cursor: pointer;
+            }}
+            
+            .explorer-row:hover {{
+                background: #2a2a2a;
+            }}
+            
+            .explorer-row.selected {{
+                background: #4a3520;
+            }}
+            
+            .row-name {{
+                overflow: hidden;
+                text-overflow: ellipsis;
+            }}
+            
+            .toggle {{
+                display: inline-block;
+                width: 14px;
+                color: #aaa;
+            }}
+            
+            .dot {{
+                display: inline-block;
+                width: 8px;
+                height: 8px;
+                border-radius: 50%;
+                margin-right: 6px;
+            }}
+        </style>
+    </head>
+    <body>
+        <div class="explorer-header">
+            <span data-key="name">Name</span>
+            <span data-key="size" class="numeric">Size</span>
+            <span data-key="count" class="numeric">Items</span>
+            <span data-key="modified" class="numeric">Modified</span>
+        </div>
+        <div id="viewport">
+            <div id="spacer"></div>
+            <div id="rows"></div>
+        </div>
+        <script>
+            // Flat breadth-first columns: children of i are first_child[i] .. + child_count[i]
+            const tree = {payload_json};
+            {_NODE_HELPERS_JS}
+            const ROW_HEIGHT = 22;
+            const OVERSCAN = 10;
+            // Browsers cap element heights, so very long lists scroll proportionally
+            const MAX_SCROLL_HEIGHT = 10000000;
+            
+            const total = tree.name.length;
+            const parent = new Int32Array(total).fill(-1);
+            for (let i = 0; i < total; i++) {{
+                for (let c = tree.first_child[i]; c < tree.first_child[i] + tree.child_count[i]; c++) {{
+                    parent[c] = i;
+                }}
+            }}
+            
+            const expanded = new Uint8Array(total);
+            expanded[0] = 1;
+            let sortKey = "size";
+            let descending = true;
+            let sortedChildren = new Map();
+            let rows = [];
+            let rowDepths = [];
+            let selectedIndex = -1;
+            
+            const viewport = document.getElementById("viewport");
+            const spacer = document.getElementById("spacer");
+            const rowsContainer = document.getElementById("rows");
+            
+            function pathOf(i) {{
+                if (i === 0) return tree.root;
+                const parentPath = pathOf(parent[i]);
+                return parentPath.endsWith(tree.sep) ? parentPath + tree.name[i] : parentPath + tree.sep + tree.name[i];
+            }}
+            
+            // Children are sorted lazily, only for folders that get expanded
+            function childrenOf(i) {{
+                let children = sortedChildren.get(i);
+                if (!children) {{
+                    children = [];
+                    for (let c = tree.first_child[i]; c < tree.first_child[i] + tree.child_count[i]; c++) {{
+                        children.push(c);
+                    }}
+                    const column = tree[sortKey];
+                    const direction = descending ? -1 : 1;
+                    if (sortKey === "name") {{
+                        children.sort((a, b) => direction * column[a].localeCompare(column[b]));
+                    }} else {{
+                        children.sort((a, b) => direction * (column[a] - column[b]));
+                    }}
+                    sortedChildren.set(i, children);
+                }}
+                return children;
+            }}
+            
+            // Rebuild the list of visible rows: proportional to what is expanded, not to the tree
+            function rebuildRows() {{
+                rows = [];
+                rowDepths = [];
+                const stack = [[0, 0]];
+                while (stack.length > 0) {{
+                    const [i, depth] = stack.pop();
+                    rows.push(i);
+                    rowDepths.push(depth);
+                    if (tree.folder[i] && expanded[i]) {{
+                        const children = childrenOf(i);
+                        for (let k = children.length - 1; k >= 0; k--) {{
+                            stack.push([children[k], depth + 1]);
+                        }}
+                    }}
+                }}
+                spacer.style.height = Math.min(rows.length * ROW_HEIGHT, MAX_SCROLL_HEIGHT) + "px";
+                requestRender();
+            }}
+            
+            function firstVisibleRow() {{
+                const fullHeight = rows.length * ROW_HEIGHT;
+                if (fullHeight <= MAX_SCROLL_HEIGHT) {{
+                    return viewport.scrollTop / ROW_HEIGHT;
+                }}
+                const scrollable = MAX_SCROLL_HEIGHT - viewport.clientHeight;
+                const rowsScrollable = rows.length - viewport.clientHeight / ROW_HEIGHT;
+                return (viewport.scrollTop / scrollable) * rowsScrollable;
+            }}
+            
+            // Only the rows in the viewport (plus overscan) exist in the DOM
+            function render() {{
+                const first = firstVisibleRow();
+                const start = Math.max(0, Math.floor(first) - OVERSCAN);
+                const end = Math.max(start, Math.min(rows.length, Math.ceil(first + viewport.clientHeight / ROW_HEIGHT) + OVERSCAN));
+                
+                while (rowsContainer.children.length < end - start) {{
+                    const row = document.createElement("div");
+                    row.className = "explorer-row";
+                    row.innerHTML = '<span class="row-name"><span class="toggle"></span><span class="dot"></span><span class="label"></span></span>' +
+                        '<span class="numeric"></span><span class="numeric"></span><span class="numeric"></span>';
+                    rowsContainer.appendChild(row);
+                }}
+                while (rowsContainer.children.length > end - start) {{
+                    rowsContainer.removeChild(rowsContainer.lastChild);
+                }}
+                
+                rowsContainer.style.transform = `translateY(${{viewport.scrollTop + (start - first) * ROW_HEIGHT}}px)`;
+                
+                for (let r = start; r < end; r++) {{
+                    const i = rows[r];
+                    const row = rowsContainer.children[r - start];
+                    const [name, size, count, modified] = row.children;
+                    row.dataset.row = r;
+                    row.classList.toggle("selected", i === selectedIndex);
+                    name.style.paddingLeft = (rowDepths[r] * 14) + "px";
+                    name.children[0].textContent = tree.folder[i] ? (expanded[i] ? "▾" : "▸") : "";
+                    name.children[1].style.background = getNodeColor({{
+                        type: tree.folder[i] ? "folder" : "file",
+                        extension: tree.extension[i],
+                        error: tree.error[i]
+                    }});
+                    name.children[2].textContent = tree.name[i];
+                    size.textContent = formatBytes(tree.size[i]);
+                    count.textContent = tree.folder[i] ? tree.count[i].toLocaleString() : "";
+                    modified.textContent = tree.modified[i] ? new Date(tree.modified[i] * 1000).toLocaleDateString() : "";
+                }}
+            }}
+            
+            let renderRequested = false;
+            function requestRender() {{
+                if (renderRequested) return;
+                renderRequested = true;
+                requestAnimationFrame(() => {{
+                    renderRequested = false;
+                    render();
+                }});
+            }}
+            
+            viewport.addEventListener("scroll", requestRender);
+            window.addEventListener("resize", requestRender);
+            
+            const publishSelection = openSelectionChannel(tree.root, reveal);
+            
+            // Click selects (and tells the graph); clicking the arrow or double click toggles
+            rowsContainer.addEventListener("click", (event) => {{
+                const row = event.target.closest(".explorer-row");
+                if (!row) return;
+                const i = rows[parseInt(row.dataset.row, 10)];
+                if (event.target.classList.contains("toggle") && tree.folder[i]) {{
+                    expanded[i] = expanded[i] ? 0 : 1;
+                    rebuildRows();
+                    return;
+                }}
+                selectedIndex = i;
+                publishSelection(pathOf(i));
+                requestRender();
+            }});
+            
+            rowsContainer.addEventListener("dblclick", (event) => {{
+                const row = event.target.closest(".explorer-row");
+                if (!row) return;
+                const i = rows[parseInt(row.dataset.row, 10)];
+                if (tree.folder[i]) {{
+                    expanded[i] = expanded[i] ? 0 : 1;
+                    rebuildRows();
+                }}
+            }});
+            
+            // Sort by clicking a column header; clicking it again flips the direction
+            document.querySelectorAll(".explorer-header span").forEach((header) => {{
+                header.addEventListener("click", () => {{
+                    const key = header.dataset.key;
+                    descending = key === sortKey ? !descending : key !== "name";
+                    sortKey = key;
+                    sortedChildren = new Map();
+                    rebuildRows();
+                }});
+            }});
+            
+            // Expand the ancestors of a path, then scroll to and select it
+            function reveal(path) {{
+                if (!path || !path.startsWith(tree.root)) return;
+                const parts = path.slice(tree.root.length).split(tree.sep).filter(part => part);
+                let i = 0;
+                for (const part of parts) {{
+                    let next = -1;
+                    for (let c = tree.first_child[i]; c < tree.first_child[i] + tree.child_count[i]; c++) {{
+                        if (tree.name[c] === part) {{
+                            next = c;
+                            break;
+                        }}
+                    }}
+                    if (next < 0) break;
+                    expanded[i] = 1;
+                    i = next;
+                }}
+                selectedIndex = i;
+                rebuildRows();
+                
+                const r = rows.indexOf(i);
+                const fullHeight = rows.length * ROW_HEIGHT;
+                if (fullHeight <= MAX_SCROLL_HEIGHT) {{
+                    viewport.scrollTop = Math.max(0, r * ROW_HEIGHT - viewport.clientHeight / 2);
+                }} else {{
+                    const rowsScrollable = rows.length - viewport.clientHeight / ROW_HEIGHT;
+                    viewport.scrollTop = (r / rowsScrollable) * (MAX_SCROLL_HEIGHT - viewport.clientHeight);
+                }}
+            }}
+            
+            rebuildRows();
+        </script>
+    </body>
+    </html>
+    """
+    
+    components.html(html_code, height=650)
+
+def publish_selection(root_path, path=None):
+    """
+    Select a path in every view of a directory, e.g. from a query result.
+    
+    The path is sent over the channel the views already share, from a hidden
+    component of its own. The views' HTML stays the same across reruns, so
+    Streamlit keeps their iframes instead of reloading them on every new
+    selection. The component also keeps the latest selection made in any view
+    and hands it to views that load later.
+    
+    Args:
+        root_path (str): Root of the scan shown in the views
+        path (str): Path to select, or None to leave the selection as it is
+    """
+    html_code = f"""
+    <script>
+        if (typeof BroadcastChannel !== "undefined") {{
+            const channel = new BroadcastChannel({json.dumps("directory-selection:" + root_path)});
+            let current = {json.dumps(path)};
+            channel.onmessage = (event) => {{
+                if (event.data.path) {{
+                    current = event.data.path;
+                }} else if (event.data.request && current) {{
+                    channel.postMessage({{ path: current }});
+                }}
+            }};
+            if (current) {{
+                channel.postMessage({{ path: current }});
+            }}
+        }}
+    </script>
+    """
+    
+    components.html(html_code, height=0)
@@ -0,0 +1,283 @@
+import os
+import sys
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from pathlib import Path
+
+from directory_scanner import scan_directory, slice_tree, extend_tree
+
+# Default memory budget for all cached scans in the process
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+def estimate_tree_bytes(data, include_files=True):
+    """
+    Estimate the memory held by a scanned directory tree.
+
+    Args:
+        data (dict): Hierarchical directory data from scan_directory
+        include_files (bool): Whether to count file nodes; slices made with
+                              slice_tree share them with the tree they came from
+
+    Returns:
+        int: Approximate size in bytes of the nested dicts, lists and values
+    """
+    total = 0
+    stack = [data]
+    while stack:
+        node = stack.pop()
+        if node["type"] == "file" and not include_files:
+            continue
+        total += sys.getsizeof(node)
+        # Keys and the "type" literals are interned and shared by every node
+        for key, value in node.items():
+            if key != "type":
+                total += sys.getsizeof(value)
+        children = node.get("children")
+        if children:
+            stack.extend(children)
+    return total
+
+def snapshot_root_mtimes(root):
+    """
+    Record the modification times of a root directory and its subdirectories.
+
+    Adding, removing or renaming an entry updates the mtime of the directory
+    that holds it, so this is a cheap check that the top of the tree is unchanged.
+
+    Args:
+        root (Path): Resolved root directory
+
+    Returns:
+        dict: Mapping of path string to st_mtime (None if inaccessible)
+    """
+    mtimes = {}
+    try:
+        mtimes[str(root)] = root.stat().st_mtime
+        with os.scandir(root) as entries:
+            for entry in entries:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        mtimes[entry.path] = entry.stat(follow_symlinks=False).st_mtime
+                except OSError:
+                    mtimes[entry.path] = None
+    except OSError:
+        mtimes[str(root)] = None
+    return mtimes
+
+class _CacheEntry:
+    """A cached scan result with the information needed to validate and evict it."""
+
+    __slots__ = ("data", "depth", "mtimes", "size", "views")
+
+    def __init__(self, data, depth, mtimes, size):
+        self.data = data
+        self.depth = depth
+        self.mtimes = mtimes
+        self.size = size
+        # Per-depth data derived from the scan: shallower slices and views built on them
+        self.views = {depth: {"tree": data}}
+
+class _KeyLock:
+    """A per-key lock that counts the threads holding or waiting for it."""
+
+    __slots__ = ("lock", "users")
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.users = 0
+
+class ScanCache:
+    """
+    Process-wide cache of directory scans shared by every session.
+
+    Entries are keyed by (resolved path, filter options) and hold the deepest
+    scan done so far. Shallower depths are sliced from it without any I/O and
+    deeper ones rescan only its frontier. Entries are checked for staleness
+    against root mtimes on every lookup, and evicted in LRU order once their
+    combined estimated size exceeds max_bytes. Slices and data derived from a
+    scan (indexes, layouts) are kept on its entry and count towards its size.
+
+    Returned trees are shared between sessions and must be treated as read-only.
+    """
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+        self._key_locks = {}
+
+    @staticmethod
+    def make_key(directory_path, include_hidden=False):
+        """Build the cache key for a scan request."""
+        return (str(Path(directory_path).resolve()), include_hidden)
+
+    def get_or_scan(self, directory_path, max_depth=3, include_hidden=False):
+        """
+        Return a scan to max_depth, reusing the cached deepest scan when it is fresh.
+
+        Concurrent requests for the same key wait for a single scan instead of
+        each walking the tree.
+
+        Args:
+            directory_path (str or Path): Path to the directory to scan
+            max_depth (int): Maximum depth to scan
+            include_hidden (bool): Whether to include hidden files/folders
+
+        Returns:
+            dict: Hierarchical directory data (read-only, shared)
+        """
+        key = self.make_key(directory_path, include_hidden)
+        root = Path(key[0])
+
+        with self._key_locked(key):
+            entry = self._lookup(key, root)
+            if entry is not None and entry.depth == max_depth:
+                return entry.data
+            if entry is not None and entry.depth > max_depth:
+                sliced = entry.views.get(max_depth, {}).get("tree")
+                if sliced is None:
+                    sliced = slice_tree(entry.data, max_depth)
+                    self._add_view(key, entry, max_depth, "tree", sliced,
+                                   estimate_tree_bytes(sliced, include_files=False))
+                return sliced
+
+            if entry is not None:
+                # Only the folders cut off at the old limit need to be listed
+                mtimes = entry.mtimes
+                data = extend_tree(entry.data, entry.depth, max_depth, include_hidden)
+            else:
+                mtimes = snapshot_root_mtimes(root)
+                data = scan_directory(root, max_depth, include_hidden)
+                if data is None:
+                    return None
+
+            self._store(key, _CacheEntry(data, max_depth, mtimes, estimate_tree_bytes(data)))
+            return data
+
+    def derived(self, data, name, build, size_of=sys.getsizeof):
+        """
+        Return data derived from a cached scan, building it once for all sessions.
+
+        Args:
+            data (dict): A tree returned by get_or_scan
+            name (str): Name of the derived data, e.g. "index"
+            build (callable): Builds the derived data from the tree
+            size_of (callable): Estimates the bytes held by the derived data
+
+        Returns:
+            The derived data; built without caching if the tree is no longer cached
+        """
+        with self._lock:
+            found = self._find_view(data)
+        if found is None:
+            return build(data)
+
+        key, entry, depth = found
+        with self._key_locked(key):
+            value = entry.views.get(depth, {}).get(name)
+            if value is None:
+                value = build(data)
+                self._add_view(key, entry, depth, name, value, size_of(value))
+            return value
+
+    def _find_view(self, data):
+        """Find the entry and depth whose tree is data; the caller holds _lock."""
+        for key, entry in self._entries.items():
+            for depth, views in entry.views.items():
+                if views.get("tree") is data:
+                    return key, entry, depth
+        return None
+
+    def _add_view(self, key, entry, depth, name, value, size):
+        """Attach derived data to an entry if it is still cached, then enforce the budget."""
+        with self._lock:
+            if self._entries.get(key) is not entry:
+                return
+            entry.views.setdefault(depth, {})[name] = value
+            entry.size += size
+            self._total_bytes += size
+            self._entries.move_to_end(key)
+            self._evict()
+
+    @contextmanager
+    def _key_locked(self, key):
+        """Hold the lock for one key, dropping it once no thread uses it."""
+        with self._lock:
+            key_lock = self._key_locks.get(key)
+            if key_lock is None:
+                key_lock = self._key_locks[key] = _KeyLock()
+            key_lock.users += 1
+
+        try:
+            with key_lock.lock:
+                yield
+        finally:
+            with self._lock:
+                key_lock.users -= 1
+                if key_lock.users == 0:
+                    del self._key_locks[key]
+
+    def _lookup(self, key, root):
+        """Return the fresh cache entry for key, dropping the entry if it is stale."""
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        if snapshot_root_mtimes(root) != entry.mtimes:
+            self.invalidate(key)
+            return None
+
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+        return entry
+
+    def _store(self, key, entry):
+        """Insert an entry and evict least recently used ones to fit the budget."""
+        # A result larger than the whole budget is returned but never cached
+        if entry.size > self.max_bytes:
+            return
+
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._total_bytes -= old.size
+            self._entries[key] = entry
+            self._total_bytes += entry.size
+            self._evict()
+
+    def _evict(self):
+        """Drop least recently used entries until the budget fits; the caller holds _lock."""
+        while self._total_bytes > self.max_bytes and self._entries:
+            _, evicted = self._entries.popitem(last=False)
+            self._total_bytes -= evicted.size
+
+    def invalidate(self, key):
+        """Drop a single entry from the cache."""
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is not None:
+                self._total_bytes -= entry.size
+
+    def clear(self):
+        """Drop every entry from the cache."""
+        with self._lock:
+            self._entries.clear()
+            self._total_bytes = 0
+
+    def stats(self):
+        """
+        Summarize the cache contents.
+
+        Returns:
+            dict: Number of entries, estimated bytes used and the byte limit
+        """
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._total_bytes,
+                "max_bytes": self.max_bytes
+            }
@@ -0,0 +1,189 @@
+import heapq
+import os
+import sys
+from bisect import bisect_left, bisect_right
+
+class ScanIndex:
+    """
+    Column-oriented index over the files in a scanned directory tree.
+
+    Files are stored in path order so every directory prefix is one contiguous
+    range. Size and modification time each have a sorted column for range
+    lookups, and extensions map to the files that carry them. A query either
+    walks files in sort order and stops at the limit, or starts from whichever
+    of these gives the fewest candidates and only checks the remaining
+    filters on those, depending on which is expected to visit fewer files.
+    """
+
+    def __init__(self, data):
+        """
+        Build the index from a scanned directory tree.
+
+        Args:
+            data (dict): Hierarchical directory data from scan_directory
+        """
+        files = []
+        stack = [data]
+        while stack:
+            node = stack.pop()
+            if node["type"] == "file":
+                if "error" not in node:
+                    files.append(node)
+            else:
+                stack.extend(node.get("children", []))
+        files.sort(key=lambda node: node["path"])
+
+        self.paths = [node["path"] for node in files]
+        self.names = [node["name"] for node in files]
+        self.sizes = [node.get("size", 0) for node in files]
+        self.mtimes = [node.get("modified", 0) for node in files]
+        self.extensions = [node.get("extension", "") for node in files]
+
+        # Record ids ordered by size and by mtime, with the sorted keys for bisect
+        self.by_size = sorted(range(len(files)), key=self.sizes.__getitem__)
+        self.sorted_sizes = [self.sizes[i] for i in self.by_size]
+        self.by_mtime = sorted(range(len(files)), key=self.mtimes.__getitem__)
+        self.sorted_mtimes = [self.mtimes[i] for i in self.by_mtime]
+
+        self.by_extension = {}
+        for i, extension in enumerate(self.extensions):
+            self.by_extension.setdefault(extension, []).append(i)
+
+    def __len__(self):
+        return len(self.paths)
+
+    def estimate_bytes(self):
+        """
+        Estimate the memory held by the index.
+
+        Paths, names, extensions and numbers are the same objects as in the
+        scanned tree, so only the containers are counted.
+
+        Returns:
+            int: Approximate size in bytes
+        """
+        columns = (self.paths, self.names, self.sizes, self.mtimes, self.extensions,
+                   self.by_size, self.sorted_sizes, self.by_mtime, self.sorted_mtimes)
+        total = sum(sys.getsizeof(column) for column in columns)
+        total += sys.getsizeof(self.by_extension)
+        total += sum(sys.getsizeof(ids) for ids in self.by_extension.values())
+        return total
+
+    def prefix_range(self, prefix):
+        """
+        Find the files under a directory.
+
+        Args:
+            prefix (str): Directory path
+
+        Returns:
+            tuple: (start, stop) record ids of the files below prefix
+        """
+        prefix = prefix.rstrip(os.sep) + os.sep
+        start = bisect_left(self.paths, prefix)
+        stop = bisect_left(self.paths, prefix + "\U0010ffff")
+        return start, stop
+
+    def record(self, i):
+        """Return the file with record id i as a dict."""
+        return {
+            "name": self.names[i],
+            "path": self.paths[i],
+            "size": self.sizes[i],
+            "modified": self.mtimes[i],
+            "extension": self.extensions[i]
+        }
+
+    def query(self, prefix=None, extensions=None, min_size=None, max_size=None,
+              modified_before=None, modified_after=None, sort_by="size",
+              descending=True, limit=100):
+        """
+        Return the top files matching all given filters.
+
+        Args:
+            prefix (str): Only files below this directory
+            extensions (list): Only files with one of these extensions
+            min_size (int): Minimum size in bytes (inclusive)
+            max_size (int): Maximum size in bytes (inclusive)
+            modified_before (float): Only files last modified before this timestamp
+            modified_after (float): Only files last modified at or after this timestamp
+            sort_by (str): "size" or "modified"
+            descending (bool): Largest/newest first when True
+            limit (int): Maximum number of results
+
+        Returns:
+            list: File records, ordered by sort_by
+        """
+        if sort_by not in ("size", "modified"):
+            raise ValueError(f"Cannot sort by {sort_by!r}")
+
+        candidates = {}
+
+        if prefix:
+            start, stop = self.prefix_range(prefix)
+            candidates["prefix"] = range(start, stop)
+
+        if extensions:
+            extensions = {ext.lower() for ext in extensions}
+            if len(extensions) == 1:
+                candidates["extension"] = self.by_extension.get(next(iter(extensions)), [])
+            else:
+                candidates["extension"] = sorted(
+                    i for ext in extensions for i in self.by_extension.get(ext, [])
+                )
+
+        if min_size is not None or max_size is not None:
+            start = 0 if min_size is None else bisect_left(self.sorted_sizes, min_size)
+            stop = len(self) if max_size is None else bisect_right(self.sorted_sizes, max_size)
+            candidates["size"] = self.by_size[start:stop]
+
+        if modified_before is not None or modified_after is not None:
+            start = 0 if modified_after is None else bisect_left(self.sorted_mtimes, modified_after)
+            stop = len(self) if modified_before is None else bisect_left(self.sorted_mtimes, modified_before)
+            candidates["modified"] = self.by_mtime[start:stop]
+
+        def matches(i):
+            if prefix and i not in candidates["prefix"]:
+                return False
+            if extensions and self.extensions[i] not in extensions:
+                return False
+            if min_size is not None and self.sizes[i] < min_size:
+                return False
+            if max_size is not None and self.sizes[i] > max_size:
+                return False
+            if modified_before is not None and self.mtimes[i] >= modified_before:
+                return False
+            if modified_after is not None and self.mtimes[i] < modified_after:
+                return False
+            return True
+
+        sort_column = self.sizes if sort_by == "size" else self.mtimes
+        sorted_ids = self.by_size if sort_by == "size" else self.by_mtime
+
+        # Drive the query from the smallest candidate set
+        driver = min(candidates, key=lambda name: len(candidates[name]), default=None)
+
+        # Walking in sort order stops after about limit / selectivity records,
+        # which beats checking every driver candidate unless the driver is small
+        walk = driver is None or driver == sort_by
+        if not walk:
+            selected = len(candidates[driver])
+            walk = limit * len(self) < selected * selected
+
+        if walk:
+            # Candidates are already in sort order: stop after the first matches
+            ordered = candidates.get(sort_by, sorted_ids)
+            if descending:
+                ordered = reversed(ordered)
+            result = []
+            for i in ordered:
+                if matches(i):
+                    result.append(i)
+                    if len(result) >= limit:
+                        break
+        else:
+            select = heapq.nlargest if descending else heapq.nsmallest
+            result = select(limit, filter(matches, candidates[driver]),
+                            key=sort_column.__getitem__)
+
+        return [self.record(i) for i in result]
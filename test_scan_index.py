@@ -0,0 +1,119 @@
+import os
+import random
+
+import pytest
+
+import scan_index
+from scan_index import ScanIndex
+
+ROOT = os.path.join(os.sep, "data")
+EXTENSIONS = [".txt", ".py", ".log", ".jpg", ".rare"]
+
+def build_tree(file_count=2000, seed=7):
+    """Build a scanned tree with unique sizes and mtimes so result order is exact."""
+    rng = random.Random(seed)
+    sizes = rng.sample(range(1, file_count * 100), file_count)
+    mtimes = rng.sample(range(1_000_000, 1_000_000 + file_count * 100), file_count)
+    folders = [{"name": f"dir{d}", "path": os.path.join(ROOT, f"dir{d}"),
+                "type": "folder", "children": []} for d in range(10)]
+    for i in range(file_count):
+        folder = folders[i % len(folders)]
+        # Only a handful of files get the rare extension, to make a selective driver
+        extension = ".rare" if i % 200 == 0 else rng.choice(EXTENSIONS[:-1])
+        name = f"file{i}{extension}"
+        folder["children"].append({
+            "name": name,
+            "path": os.path.join(folder["path"], name),
+            "type": "file",
+            "size": sizes[i],
+            "modified": mtimes[i],
+            "extension": extension
+        })
+    return {"name": "data", "path": ROOT, "type": "folder", "children": folders}
+
+def brute_force(files, prefix=None, extensions=None, min_size=None, max_size=None,
+                modified_before=None, modified_after=None, sort_by="size",
+                descending=True, limit=100):
+    """Filter and sort every file directly."""
+    if prefix:
+        prefix = prefix.rstrip(os.sep) + os.sep
+    result = [
+        node for node in files
+        if (not prefix or node["path"].startswith(prefix))
+        and (not extensions or node["extension"] in extensions)
+        and (min_size is None or node["size"] >= min_size)
+        and (max_size is None or node["size"] <= max_size)
+        and (modified_before is None or node["modified"] < modified_before)
+        and (modified_after is None or node["modified"] >= modified_after)
+    ]
+    result.sort(key=lambda node: node[sort_by], reverse=descending)
+    return [node["path"] for node in result[:limit]]
+
+@pytest.fixture(scope="module")
+def tree():
+    return build_tree()
+
+@pytest.fixture(scope="module")
+def files(tree):
+    return [node for folder in tree["children"] for node in folder["children"]]
+
+@pytest.fixture
+def plans(monkeypatch):
+    """Record whether each query used the heap instead of the ordered walk."""
+    used = []
+
+    def recording(select):
+        def wrapper(*args, **kwargs):
+            used.append("heap")
+            return select(*args, **kwargs)
+        return wrapper
+
+    monkeypatch.setattr(scan_index.heapq, "nlargest", recording(scan_index.heapq.nlargest))
+    monkeypatch.setattr(scan_index.heapq, "nsmallest", recording(scan_index.heapq.nsmallest))
+    return used
+
+QUERIES = [
+    # Selective extension driver: the heap over the few candidates is cheaper
+    ({"extensions": [".rare"], "sort_by": "size", "limit": 5}, "heap"),
+    ({"extensions": [".rare"], "sort_by": "modified", "descending": False, "limit": 5}, "heap"),
+    # Broad filters on another column: walking in sort order stops early
+    ({"min_size": 1000, "sort_by": "modified", "limit": 10}, "walk"),
+    ({"modified_before": 1_150_000, "sort_by": "size", "limit": 10}, "walk"),
+    ({"prefix": os.path.join(ROOT, "dir3"), "extensions": [".txt", ".py"],
+      "sort_by": "size", "descending": False, "limit": 10}, "walk"),
+    # Driver on the sort column itself is always walked
+    ({"min_size": 50_000, "max_size": 60_000, "sort_by": "size", "limit": 20}, "walk"),
+    # No filters at all
+    ({"sort_by": "modified", "limit": 15}, "walk"),
+]
+
+@pytest.mark.parametrize("kwargs, plan", QUERIES)
+def test_query_matches_brute_force(tree, files, plans, kwargs, plan):
+    index = ScanIndex(tree)
+
+    result = [record["path"] for record in index.query(**kwargs)]
+
+    assert result == brute_force(files, **kwargs)
+    assert ("heap" if plans else "walk") == plan
+
+def test_random_queries_match_brute_force(tree, files):
+    index = ScanIndex(tree)
+    rng = random.Random(11)
+    for _ in range(300):
+        kwargs = {
+            "sort_by": rng.choice(["size", "modified"]),
+            "descending": rng.random() < 0.5,
+            "limit": rng.choice([1, 5, 50, 500])
+        }
+        if rng.random() < 0.3:
+            kwargs["prefix"] = os.path.join(ROOT, f"dir{rng.randrange(10)}")
+        if rng.random() < 0.3:
+            kwargs["extensions"] = rng.sample(EXTENSIONS, rng.randint(1, 2))
+        if rng.random() < 0.4:
+            kwargs["min_size"] = rng.randrange(200_000)
+        if rng.random() < 0.4:
+            kwargs["modified_before"] = rng.randrange(1_000_000, 1_200_000)
+
+        result = [record["path"] for record in index.query(**kwargs)]
+
+        assert result == brute_force(files, **kwargs), kwargs
@@ -0,0 +1,169 @@
+import math
+import os
+import random
+import time
+
+def _list_directory(path, include_hidden, is_root):
+    """
+    List one directory the way scan_directory sees it.
+
+    Returns:
+        tuple: (number of entries, subdirectory paths, total bytes of files)
+    """
+    entries = 0
+    subdirs = []
+    file_bytes = 0
+    try:
+        with os.scandir(path) as iterator:
+            for entry in iterator:
+                # Skip hidden files/folders (starting with .) except at root level
+                if not include_hidden and not is_root and entry.name.startswith('.'):
+                    continue
+                try:
+                    if entry.is_file():
+                        entries += 1
+                        file_bytes += entry.stat().st_size
+                    elif entry.is_dir():
+                        entries += 1
+                        # Symlinked folders are counted but not walked, so a
+                        # link back up the tree cannot loop until max_depth
+                        if not entry.is_symlink():
+                            subdirs.append(entry.path)
+                except OSError:
+                    # Counted like scan_directory's "Access error" nodes
+                    entries += 1
+    except OSError:
+        pass
+    return entries, subdirs, file_bytes
+
+def _interval(values, z=1.96):
+    """Mean of per-walk estimates with a normal-approximation confidence interval."""
+    n = len(values)
+    mean = sum(values) / n
+    if n < 2:
+        return {"mean": mean, "low": mean, "high": mean}
+    variance = sum((value - mean) ** 2 for value in values) / (n - 1)
+    margin = z * math.sqrt(variance / n)
+    return {"mean": mean, "low": max(0.0, mean - margin), "high": mean + margin}
+
+def estimate_tree(directory_path, max_depth=10, include_hidden=False,
+                  time_budget=3.0, max_samples=5000, seed=None):
+    """
+    Estimate the size of a directory tree from random root-to-leaf walks.
+
+    Uses Knuth's path sampling estimator: each walk picks a random
+    subdirectory at every level and weights what it sees at a level by the
+    product of the branching factors above it. Averaged over many walks this
+    is an unbiased estimate of entries and bytes per level. Directory
+    listings are memoized, so the top levels are only read once.
+
+    Args:
+        directory_path (str or Path): Root of the tree to estimate
+        max_depth (int): Deepest level to sample, by default the deepest scan
+        include_hidden (bool): Whether to count hidden files/folders below the root
+        time_budget (float): Seconds to spend sampling
+        max_samples (int): Maximum number of walks
+        seed (int): Seed for the random generator, for reproducible estimates
+
+    Returns:
+        dict: Number of walks, elapsed seconds, and mean/low/high estimates of
+              total entries, total bytes and entries per depth (index 0 is the root)
+    """
+    rng = random.Random(seed)
+    listings = {}
+    root = str(directory_path)
+    started = time.perf_counter()
+
+    entry_samples = []
+    byte_samples = []
+    depth_samples = []
+
+    while len(entry_samples) < max_samples:
+        if entry_samples and time.perf_counter() - started > time_budget:
+            break
+
+        path = root
+        weight = 1
+        depth = 0
+        per_depth = [1]
+        total_bytes = 0
+
+        # Walk down until a leaf or the depth limit
+        while depth < max_depth:
+            if path not in listings:
+                listings[path] = _list_directory(path, include_hidden, depth == 0)
+            entries, subdirs, file_bytes = listings[path]
+
+            per_depth.append(weight * entries)
+            total_bytes += weight * file_bytes
+
+            if not subdirs:
+                break
+            weight *= len(subdirs)
+            path = rng.choice(subdirs)
+            depth += 1
+
+        entry_samples.append(sum(per_depth))
+        byte_samples.append(total_bytes)
+        depth_samples.append(per_depth)
+
+    # Walks that ended early contribute zero to the deeper levels
+    deepest = max(len(per_depth) for per_depth in depth_samples)
+    profile = []
+    for level in range(deepest):
+        values = [per_depth[level] if level < len(per_depth) else 0
+                  for per_depth in depth_samples]
+        profile.append(_interval(values))
+
+    # Drop trailing levels that are empty in every walk
+    while len(profile) > 1 and profile[-1]["high"] == 0:
+        profile.pop()
+
+    return {
+        "samples": len(entry_samples),
+        "elapsed": time.perf_counter() - started,
+        "entries": _interval(entry_samples),
+        "bytes": _interval(byte_samples),
+        "depth_profile": profile
+    }
+
+def entries_up_to_depth(estimate, max_depth):
+    """
+    Estimated number of entries a scan to max_depth would return.
+
+    Args:
+        estimate (dict): Result of estimate_tree
+        max_depth (int): Depth limit of the scan
+
+    Returns:
+        float: Sum of the mean entries per level up to max_depth
+    """
+    return sum(level["mean"] for level in estimate["depth_profile"][:max_depth + 1])
+
+def recommend_depth(estimate, entry_budget, min_depth=1, max_depth=10):
+    """
+    Pick the deepest scan depth expected to stay within an entry budget.
+
+    The upper confidence bound of each level is used, so the pick errs on
+    the side of scanning less.
+
+    Args:
+        estimate (dict): Result of estimate_tree
+        entry_budget (int): Maximum number of entries the scan should return
+        min_depth (int): Smallest depth to return
+        max_depth (int): Largest depth to return
+
+    Returns:
+        int: Recommended depth limit
+    """
+    total = 0
+    best = min_depth
+    for depth, level in enumerate(estimate["depth_profile"]):
+        total += level["high"]
+        if total > entry_budget or depth > max_depth:
+            break
+        best = max(min_depth, depth)
+    else:
+        # Every sampled level fits, so the deepest allowed depth is safe
+        best = max_depth
+    return best
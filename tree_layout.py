@@ -0,0 +1,274 @@
+import math
+
+def compute_folder_sizes(data):
+    """
+    Roll file sizes up the directory tree.
+
+    Args:
+        data (dict): Hierarchical directory data from scan_directory
+
+    Returns:
+        dict: Mapping of id(node) to the total size in bytes below that node
+    """
+    sizes = {}
+
+    # Iterative post-order walk so deep trees don't hit the recursion limit
+    stack = [(data, False)]
+    while stack:
+        node, visited = stack.pop()
+        if node["type"] == "file":
+            sizes[id(node)] = node.get("size", 0) or 0
+        elif visited:
+            sizes[id(node)] = sum(sizes[id(child)] for child in node.get("children", []))
+        else:
+            stack.append((node, True))
+            for child in node.get("children", []):
+                stack.append((child, False))
+
+    return sizes
+
+def _node_record(node, size, depth):
+    """Build the flat record shared by the canvas views."""
+    return {
+        "name": node["name"],
+        "path": node["path"],
+        "type": node["type"],
+        "extension": node.get("extension", ""),
+        "size": size,
+        "modified": node.get("modified", 0),
+        "error": node.get("error"),
+        "depth": depth
+    }
+
+def _worst_ratio(row_sum, largest, smallest, side):
+    """Worst aspect ratio of a row of rectangles laid along a side."""
+    side_sq = side * side
+    sum_sq = row_sum * row_sum
+    return max(side_sq * largest / sum_sq, sum_sq / (side_sq * smallest))
+
+def squarify(values, x, y, width, height):
+    """
+    Lay out values as rectangles with aspect ratios close to 1.
+
+    Implements the squarified treemap algorithm (Bruls, Huizing, van Wijk).
+
+    Args:
+        values (list): Positive values sorted in descending order
+        x (float): Left edge of the rectangle to fill
+        y (float): Top edge of the rectangle to fill
+        width (float): Width of the rectangle to fill
+        height (float): Height of the rectangle to fill
+
+    Returns:
+        list: (x, y, width, height) tuples in the same order as values
+    """
+    total = sum(values)
+    if total <= 0 or width <= 0 or height <= 0:
+        return [(x, y, 0, 0) for _ in values]
+
+    # Scale values so they are expressed as areas
+    scale = width * height / total
+    areas = [value * scale for value in values]
+
+    rects = []
+    i = 0
+    while i < len(areas):
+        side = min(width, height)
+        row_sum = areas[i]
+        best = _worst_ratio(row_sum, areas[i], areas[i], side)
+        j = i + 1
+
+        # Grow the row while it keeps improving the worst aspect ratio
+        while j < len(areas):
+            candidate = _worst_ratio(row_sum + areas[j], areas[i], areas[j], side)
+            if candidate > best:
+                break
+            row_sum += areas[j]
+            best = candidate
+            j += 1
+
+        # Lay the row along the shorter side and shrink the free space
+        if width >= height:
+            row_width = row_sum / height
+            offset = y
+            for area in areas[i:j]:
+                cell_height = area / row_width
+                rects.append((x, offset, row_width, cell_height))
+                offset += cell_height
+            x += row_width
+            width -= row_width
+        else:
+            row_height = row_sum / width
+            offset = x
+            for area in areas[i:j]:
+                cell_width = area / row_height
+                rects.append((offset, y, cell_width, row_height))
+                offset += cell_width
+            y += row_height
+            height -= row_height
+
+        i = j
+
+    return rects
+
+def treemap_layout(data, width=1200, height=600, padding=1, header=14, min_area=1.0):
+    """
+    Compute a squarified treemap layout for a directory tree.
+
+    Each node is visited once, and subtrees whose rectangle is smaller than
+    min_area are not descended into, so the output only holds rectangles that
+    are visible. The squarified algorithm needs each folder's children in
+    descending size order, so the cost is O(n log n) overall (a sort of k
+    children per folder); the walk and row layout themselves are linear.
+
+    Args:
+        data (dict): Hierarchical directory data from scan_directory
+        width (float): Width of the layout in pixels
+        height (float): Height of the layout in pixels
+        padding (float): Gap between a folder's edge and its children
+        header (float): Space reserved at the top of a folder for its label
+        min_area (float): Smallest rectangle area (in square pixels) to emit
+
+    Returns:
+        list: Node records with x0, y0, x1, y1 in pre-order
+    """
+    sizes = compute_folder_sizes(data)
+    records = []
+
+    stack = [(data, 0, 0.0, 0.0, float(width), float(height))]
+    while stack:
+        node, depth, x, y, w, h = stack.pop()
+        record = _node_record(node, sizes[id(node)], depth)
+        record.update({
+            "x0": round(x, 2),
+            "y0": round(y, 2),
+            "x1": round(x + w, 2),
+            "y1": round(y + h, 2)
+        })
+        records.append(record)
+
+        if node["type"] != "folder":
+            continue
+
+        # Reserve room for the label only when the folder is tall enough
+        top = header if h > header * 2 else 0
+        inner_x = x + padding
+        inner_y = y + padding + top
+        inner_w = w - padding * 2
+        inner_h = h - padding * 2 - top
+        if inner_w * inner_h < min_area:
+            continue
+
+        children = [child for child in node.get("children", []) if sizes[id(child)] > 0]
+        children.sort(key=lambda child: sizes[id(child)], reverse=True)
+        rects = squarify([sizes[id(child)] for child in children],
+                         inner_x, inner_y, inner_w, inner_h)
+
+        # Push in reverse so children come out in descending size order
+        for child, (cx, cy, cw, ch) in reversed(list(zip(children, rects))):
+            if cw * ch >= min_area:
+                stack.append((child, depth + 1, cx, cy, cw, ch))
+
+    return records
+
+def sunburst_layout(data, min_angle=0.002):
+    """
+    Compute a sunburst (radial partition) layout for a directory tree.
+
+    Angles are proportional to rolled-up sizes and each ring is one level of
+    depth. Arcs narrower than min_angle are not descended into.
+
+    Args:
+        data (dict): Hierarchical directory data from scan_directory
+        min_angle (float): Smallest arc (in radians) to emit
+
+    Returns:
+        tuple: (records, max_depth) where records hold x0/x1 as start/end
+               angles and depth as the ring index, in pre-order
+    """
+    sizes = compute_folder_sizes(data)
+    records = []
+    max_depth = 0
+
+    stack = [(data, 0, 0.0, 2 * math.pi)]
+    while stack:
+        node, depth, start, end = stack.pop()
+        record = _node_record(node, sizes[id(node)], depth)
+        record.update({"x0": round(start, 5), "x1": round(end, 5)})
+        records.append(record)
+        max_depth = max(max_depth, depth)
+
+        total = sizes[id(node)]
+        if node["type"] != "folder" or total <= 0:
+            continue
+
+        span = end - start
+        offset = start
+        placed = []
+        for child in node.get("children", []):
+            child_span = span * sizes[id(child)] / total
+            if child_span >= min_angle:
+                placed.append((child, depth + 1, offset, offset + child_span))
+            offset += child_span
+        stack.extend(reversed(placed))
+
+    return records, max_depth
+
+def flatten_tree(data):
+    """
+    Flatten a directory tree into columns with folder rollups.
+
+    Nodes are stored in breadth-first order, so the children of node i are the
+    contiguous range first_child[i] .. first_child[i] + child_count[i]. Folder
+    rollups are filled in a single reverse pass, since every child comes
+    after its parent.
+
+    Args:
+        data (dict): Hierarchical directory data from scan_directory
+
+    Returns:
+        dict: Column lists (name, folder, extension, error, first_child,
+              child_count, size, count, modified) plus the root path
+    """
+    nodes = [data]
+    parents = [-1]
+    first_child = []
+    child_count = []
+
+    i = 0
+    while i < len(nodes):
+        children = nodes[i].get("children", []) if nodes[i]["type"] == "folder" else []
+        first_child.append(len(nodes))
+        child_count.append(len(children))
+        nodes.extend(children)
+        parents.extend([i] * len(children))
+        i += 1
+
+    # Rolled-up size, number of entries below and latest modification time
+    sizes = [0] * len(nodes)
+    counts = [0] * len(nodes)
+    modified = [0] * len(nodes)
+    for i in range(len(nodes) - 1, -1, -1):
+        node = nodes[i]
+        if node["type"] == "file":
+            sizes[i] = node.get("size", 0) or 0
+            # Whole seconds are enough for display and keep the payload small
+            modified[i] = int(node.get("modified", 0) or 0)
+        parent = parents[i]
+        if parent >= 0:
+            sizes[parent] += sizes[i]
+            counts[parent] += counts[i] + 1
+            modified[parent] = max(modified[parent], modified[i])
+
+    return {
+        "root": data["path"],
+        "name": [node["name"] for node in nodes],
+        "folder": [1 if node["type"] == "folder" else 0 for node in nodes],
+        "extension": [node.get("extension", "") if node["type"] == "file" else "" for node in nodes],
+        "error": [1 if node.get("error") else 0 for node in nodes],
+        "first_child": first_child,
+        "child_count": child_count,
+        "size": sizes,
+        "count": counts,
+        "modified": modified
+    }